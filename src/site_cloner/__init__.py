@@ -14,6 +14,7 @@ __all__ = [
     "analyze_page_structure",
     "create_site_map",
     "download_asset",
+    "download_assets",
     "extract_assets",
     "fetch_page",
     "main",
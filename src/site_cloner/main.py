@@ -8,60 +8,333 @@ be used with Claude or other LLMs via the Model Context Protocol (MCP).
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import functools
 import re
 import urllib.parse
-from pathlib import Path
-from typing import Any
+from collections import Counter
+from contextlib import asynccontextmanager
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, BinaryIO
 
 import httpx
 from bs4 import BeautifulSoup
 from mcp.server.fastmcp import FastMCP
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 
-# Initialize FastMCP server
-mcp = FastMCP("site-cloner")
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 # Constants
+# Prefer the C-backed lxml parser, falling back to the pure-Python one if it's missing
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    PARSER = "html.parser"
+else:
+    PARSER = "lxml"
+
+# html5-parser is optional: it has to be built against the same libxml2 as lxml, and
+# refuses to import (with a RuntimeError) when they don't match
+try:
+    from html5_parser import parse as html5_parse
+except (ImportError, RuntimeError):
+    html5_parse = None
+
+# Documents above this size are parsed with html5-parser when it's available, and are
+# never kept in the parse caches
+LARGE_DOCUMENT_SIZE = 256 * 1024
+PARSE_CACHE_SIZE = 16
+
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
 }
+MAX_CRAWL_CONCURRENCY = 32
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+ASSET_SUBDIRS = ("html", "css", "js", "images", "fonts", "videos", "other")
+
+# Asset subdirectory by MIME type: whole top-level types first, then specific subtypes
+_SUBDIR_BY_MAIN_TYPE = {"image": "images", "font": "fonts", "video": "videos"}
+_SUBDIR_BY_SUBTYPE = {
+    "text": {"html": "html", "css": "css", "javascript": "js", "x-javascript": "js"},
+    "application": {"javascript": "js", "x-javascript": "js"},
+}
+
+# Precompiled patterns used on hot paths
+_CSS_URL_RE = re.compile(r"url\(\s*['\"]?([^'\")]+)")
+_CSS_ASSET_RE = re.compile(r"(@font-face\s*\{[^}]*\})|url\(\s*['\"]?([^'\")]+)")
+_UNSAFE_CHARS_RE = re.compile(r"[^\w\-.]", re.ASCII)
+# URL of each "url [descriptor]" candidate in an srcset attribute
+_SRCSET_RE = re.compile(r"\s*([^\s,]+)(?:\s+[^,]*)?,?")
+
+_FONT_EXTENSIONS = frozenset(("woff", "woff2", "ttf", "eot", "otf"))
+
+# Every node extract_assets cares about, matched in a single selector query
+_ASSET_SELECTOR = "link[href], script[src], img, video source[src], iframe[src], [style]"
+
+# Shared HTTP client, created lazily so every tool call reuses pooled connections
+_CLIENT: httpx.AsyncClient | None = None
 
 
 # Helper functions
+def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _CLIENT  # noqa: PLW0603
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+            timeout=30.0,
+            headers=DEFAULT_HEADERS,
+        )
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client if it has been created."""
+    global _CLIENT  # noqa: PLW0603
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+        _CLIENT = None
+
+
 async def fetch_url(
     url: str,
     headers: dict[str, str] | None = None,
 ) -> httpx.Response:
     """Fetch content from a URL with proper error handling."""
-    request_headers = DEFAULT_HEADERS.copy()
-    if headers:
-        request_headers.update(headers)
+    # No try/except here - let exceptions propagate to callers
+    response = await get_client().get(url, headers=headers)
+    response.raise_for_status()
+    return response
+
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        # No try/except here - let exceptions propagate to callers
-        response = await client.get(url, headers=request_headers, timeout=30.0)
-        response.raise_for_status()
-        return response
+async def fetch_bytes(
+    url: str,
+    headers: dict[str, str] | None = None,
+) -> tuple[bytes, httpx.Headers, int, str]:
+    """Fetch the raw body of a URL along with its headers, status code and final URL."""
+    response = await fetch_url(url, headers)
+    return response.content, response.headers, response.status_code, str(response.url)
 
 
+async def fetch_text(
+    url: str,
+    headers: dict[str, str] | None = None,
+) -> str:
+    """Fetch a URL and decode its body using the charset from its headers."""
+    content, response_headers, _, _ = await fetch_bytes(url, headers)
+    return content.decode(get_encoding(response_headers), errors="replace")
+
+
+def get_encoding(headers: httpx.Headers) -> str:
+    """Return the charset declared in the Content-Type header, defaulting to UTF-8."""
+    _, _, params = headers.get("content-type", "").partition(";")
+    for param in params.split(";"):
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            try:
+                return codecs.lookup(value.strip().strip("'\"")).name
+            except LookupError:
+                break
+    return "utf-8"
+
+
+def headers_to_dict(headers: httpx.Headers) -> dict[str, str]:
+    """Flatten response headers into a plain dict, joining repeated headers like httpx does."""
+    # dict(headers) looks every key up again in the header list; one pass over the raw pairs avoids that
+    encoding = headers.encoding
+    result = {}
+    for raw_key, raw_value in headers.raw:
+        key = raw_key.decode(encoding).lower()
+        value = raw_value.decode(encoding)
+        result[key] = f"{result[key]}, {value}" if key in result else value
+    return result
+
+
+@functools.lru_cache(maxsize=4096)
 def get_base_url(url: str) -> str:
     """Extract the base URL from a full URL."""
     parsed = urllib.parse.urlparse(url)
     return f"{parsed.scheme}://{parsed.netloc}"
 
 
+@functools.lru_cache(maxsize=4096)
 def is_absolute_url(url: str) -> bool:
     """Check if a URL is absolute."""
     return bool(urllib.parse.urlparse(url).netloc)
 
 
+@functools.lru_cache(maxsize=16384)
 def normalize_url(base_url: str, url: str) -> str:
     """Convert relative URLs to absolute URLs."""
+    # Fast path for the common absolute forms ("https://...", "//cdn...") without parsing the URL
+    if url.startswith("//"):
+        return url
+    scheme_end = url.find("://", 0, 8)
+    if scheme_end > 0 and url[:scheme_end].isalpha():
+        return url
     if is_absolute_url(url):
         return url
     return urllib.parse.urljoin(base_url, url)
 
 
+def build_soup(html_content: str) -> BeautifulSoup:
+    """Parse HTML into a BeautifulSoup tree."""
+    if html5_parse is not None and len(html_content) > LARGE_DOCUMENT_SIZE:
+        # html5-parser tokenizes in C and builds the soup directly, which pays off on large pages
+        return html5_parse(html_content, treebuilder="soup", return_root=False)
+    return BeautifulSoup(html_content, PARSER)
+
+
+# Parsed documents are cached so the same HTML passed to several tools isn't parsed again:
+# fetch_page's content handed on to analyze_page_structure reuses its soup, and repeated
+# extract_assets calls on one page reuse its selectolax tree. Only documents up to
+# LARGE_DOCUMENT_SIZE are cached, which keeps each cache to at most PARSE_CACHE_SIZE small
+# documents instead of pinning multi-MB pages and their trees for the life of the process.
+# The returned trees are shared between callers and must not be modified. Tools call these
+# via asyncio.to_thread so parsing a large page doesn't stall other requests on the event loop.
+_cached_soup = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(build_soup)
+_cached_tree = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(LexborHTMLParser)
+
+
+def parse_soup(html_content: str) -> BeautifulSoup:
+    """Parse HTML into a BeautifulSoup tree, reusing the cached tree for small documents."""
+    if len(html_content) > LARGE_DOCUMENT_SIZE:
+        return build_soup(html_content)
+    return _cached_soup(html_content)
+
+
+def parse_tree(html_content: str) -> LexborHTMLParser:
+    """Parse HTML into a selectolax tree, reusing the cached tree for small documents."""
+    if len(html_content) > LARGE_DOCUMENT_SIZE:
+        return LexborHTMLParser(html_content)
+    return _cached_tree(html_content)
+
+
+def get_asset_subdir(content_type: str) -> str:
+    """Map a MIME type to the subdirectory its assets are saved in."""
+    main_type, _, subtype = content_type.strip().lower().partition("/")
+    subdir = _SUBDIR_BY_MAIN_TYPE.get(main_type)
+    if subdir is None:
+        # Legacy font types: application/font, application/font-woff, application/font-ttf, ...
+        if main_type == "application" and subtype.startswith("font"):
+            return "fonts"
+        subdir = _SUBDIR_BY_SUBTYPE.get(main_type, {}).get(subtype, "other")
+    return subdir
+
+
+class DownloadLayout:
+    """Output directory for downloaded assets, with one subdirectory per asset type.
+
+    All subdirectories are created up front so a batch of downloads can share one layout
+    without touching the filesystem again for every asset.
+    """
+
+    def __init__(self, output_dir: str) -> None:
+        """Create the output directory and all asset subdirectories."""
+        output_path = Path(output_dir)
+        self.subdirs = {subdir: output_path / subdir for subdir in ASSET_SUBDIRS}
+        for subdir_path in self.subdirs.values():
+            subdir_path.mkdir(parents=True, exist_ok=True)
+        # Next free counter for each (subdir, filename), so name collisions don't rescan the directory
+        self._name_counters: dict[tuple[str, str], int] = {}
+
+    def open_new_file(self, subdir: str, filename: str) -> tuple[Path, BinaryIO]:
+        """Claim an unused path for filename in subdir and open it for writing."""
+        subdir_path = self.subdirs[subdir]
+        stem, dot, suffix = filename.rpartition(".")
+        if not stem:
+            stem, dot, suffix = filename, "", ""
+
+        key = (subdir, filename)
+        counter = self._name_counters.get(key, 0)
+        while True:
+            candidate = filename if counter == 0 else f"{stem}_{counter}{dot}{suffix}"
+            file_path = subdir_path / candidate
+            try:
+                # Exclusive creation, so concurrent downloads can never claim the same file
+                file = file_path.open("xb")
+            except FileExistsError:
+                counter += 1
+                continue
+            self._name_counters[key] = counter + 1
+            return file_path, file
+
+
+async def save_asset(url: str, layout: DownloadLayout) -> dict[str, Any]:
+    """Download an asset from a URL and save it into the given layout."""
+    try:
+        # Determine the filename
+        parsed_url = urllib.parse.urlparse(url)
+        path = parsed_url.path
+
+        if not path or path.endswith("/"):
+            # Handle URLs without a path or ending with /
+            filename = "index.html"
+        else:
+            # PurePosixPath drops "." segments, so ".../sub/." is named after "sub"
+            filename = PurePosixPath(path).name
+            if filename in ("", ".."):
+                filename = "unknown_file"
+
+            # Handle query parameters in URLs
+            if parsed_url.query:
+                # Remove invalid characters for filenames
+                safe_query = _UNSAFE_CHARS_RE.sub("_", parsed_url.query)
+                filename = f"{filename}_{safe_query}"
+
+        # Stream the response so only one chunk of the body is held in memory at a time
+        async with get_client().stream("GET", url) as response:
+            response.raise_for_status()
+
+            # Pick a subdirectory based on content type
+            content_type = response.headers.get("content-type", "").split(";")[0]
+            subdir = get_asset_subdir(content_type)
+
+            # Write the content chunk by chunk, offloading disk I/O so it doesn't block the event loop
+            size = 0
+            file_path, file = await asyncio.to_thread(layout.open_new_file, subdir, filename)
+            completed = False
+            try:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    await asyncio.to_thread(file.write, chunk)
+                    size += len(chunk)
+                completed = True
+            finally:
+                await asyncio.to_thread(file.close)
+                if not completed:
+                    # Don't leave a truncated file behind if the body fails (or is cancelled) partway through
+                    await asyncio.to_thread(file_path.unlink, missing_ok=True)
+
+        return {
+            "success": True,
+            "url": url,
+            "saved_to": str(file_path),
+            "content_type": content_type,
+            "size": size,
+        }
+    except Exception as e:  # noqa: BLE001
+        # Broad exception is justified as we're returning error information to users
+        return {"success": False, "url": url, "error": str(e)}
+
+
+@asynccontextmanager
+async def lifespan(_server: FastMCP) -> AsyncIterator[None]:
+    """Release the shared HTTP client when the server shuts down."""
+    try:
+        yield
+    finally:
+        await close_client()
+
+
+# Initialize FastMCP server
+mcp = FastMCP("site-cloner", lifespan=lifespan)
+
+
 # MCP tools
 @mcp.tool()
 async def fetch_page(url: str) -> dict[str, Any]:
@@ -71,8 +344,9 @@ async def fetch_page(url: str) -> dict[str, Any]:
         url: The URL of the webpage to fetch
     """
     try:
-        response = await fetch_url(url)
-        html_content = response.text
+        content, response_headers, status_code, final_url = await fetch_bytes(url)
+        # Decode once with the declared charset instead of running encoding detection over the body
+        html_content = content.decode(get_encoding(response_headers), errors="replace")
 
         # Get content length and create a summary
         content_length = len(html_content)
@@ -86,7 +360,7 @@ async def fetch_page(url: str) -> dict[str, Any]:
             html_content = html_content[:max_content_length] + "\n... [Content truncated]"
 
         # Create a summary using BeautifulSoup
-        soup = BeautifulSoup(html_content, "html.parser")
+        soup = await asyncio.to_thread(parse_soup, html_content)
 
         summary = {
             "title": soup.title.text if soup.title else "No title",
@@ -101,9 +375,9 @@ async def fetch_page(url: str) -> dict[str, Any]:
         return {
             "content": html_content,
             "summary": summary,
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "url": str(response.url),
+            "status_code": status_code,
+            "headers": headers_to_dict(response_headers),
+            "url": final_url,
         }
     except Exception as e:  # noqa: BLE001
         # Broad exception is justified as we're returning error information to users
@@ -126,72 +400,88 @@ async def extract_assets(url: str, html_content: str) -> dict[str, list[str]]:
         html_content: The HTML content to parse
     """
     base_url = get_base_url(url)
-    soup = BeautifulSoup(html_content, "html.parser")
+    tree = await asyncio.to_thread(parse_tree, html_content)
 
-    # Initialize asset containers
+    # Initialize asset containers; sets drop repeated references as they are found
     assets = {
-        "css": [],
-        "javascript": [],
-        "images": [],
-        "fonts": [],
-        "videos": [],
-        "other": [],
+        "css": set(),
+        "javascript": set(),
+        "images": set(),
+        "fonts": set(),
+        "videos": set(),
+        "other": set(),
     }
 
-    # Extract CSS links
-    for link in soup.find_all("link", rel="stylesheet"):
-        if "href" in link.attrs:
-            css_url = normalize_url(base_url, link["href"])
-            assets["css"].append(css_url)
-
-    # Extract JavaScript
-    for script in soup.find_all("script"):
-        if "src" in script.attrs:
-            js_url = normalize_url(base_url, script["src"])
-            assets["javascript"].append(js_url)
-
-    # Extract images
-    for img in soup.find_all("img"):
-        if "src" in img.attrs:
-            img_url = normalize_url(base_url, img["src"])
-            assets["images"].append(img_url)
+    # Raw references already resolved on this page, shared across categories
+    resolved = {}
+
+    def resolve(ref: str) -> str:
+        full_url = resolved.get(ref)
+        if full_url is None:
+            full_url = resolved[ref] = normalize_url(base_url, ref)
+        return full_url
+
+    def handle_link(attrs: dict[str, str | None], _node: LexborNode) -> None:
+        href = attrs.get("href")
+        if href is None:
+            return
+        rel = (attrs.get("rel") or "").lower().split()
+        # Extract CSS links
+        if "stylesheet" in rel:
+            assets["css"].add(resolve(href))
+        # Extract fonts (typically in CSS, but sometimes directly linked)
+        if "preload" in rel and attrs.get("as") == "font":
+            assets["fonts"].add(resolve(href))
+
+    def handle_script(attrs: dict[str, str | None], _node: LexborNode) -> None:
+        if attrs.get("src") is not None:
+            assets["javascript"].add(resolve(attrs["src"]))
+
+    def handle_img(attrs: dict[str, str | None], _node: LexborNode) -> None:
+        if attrs.get("src") is not None:
+            assets["images"].add(resolve(attrs["src"]))
         # Also check srcset attribute
-        if "srcset" in img.attrs:
-            srcset = img["srcset"]
-            for src_item in srcset.split(","):
-                src_parts = src_item.strip().split(" ")
-                if len(src_parts) >= 1:
-                    img_url = normalize_url(base_url, src_parts[0].strip())
-                    assets["images"].append(img_url)
-
-    # Extract background images from inline styles
-    for tag in soup.find_all(style=True):
-        style = tag["style"]
-        style_urls = re.findall(r'url\([\'"]?(.*?)[\'"]?\)', style)
-        for style_url in style_urls:
-            full_url = normalize_url(base_url, style_url)
-            assets["images"].append(full_url)
-
-    # Extract fonts (typically in CSS, but sometimes directly linked)
-    for link in soup.find_all("link", rel="preload"):
-        if "href" in link.attrs and "as" in link.attrs and link["as"] == "font":
-            font_url = normalize_url(base_url, link["href"])
-            assets["fonts"].append(font_url)
-
-    # Extract videos
-    for video in soup.find_all("video"):
-        for source in video.find_all("source"):
-            if "src" in source.attrs:
-                video_url = normalize_url(base_url, source["src"])
-                assets["videos"].append(video_url)
-
-    # Extract iframes
-    for iframe in soup.find_all("iframe"):
-        if "src" in iframe.attrs:
-            iframe_url = normalize_url(base_url, iframe["src"])
-            assets["other"].append(iframe_url)
-
-    return assets
+        srcset = attrs.get("srcset")
+        if srcset is not None:
+            for src_url in _SRCSET_RE.findall(srcset):
+                assets["images"].add(resolve(src_url))
+
+    def handle_source(attrs: dict[str, str | None], node: LexborNode) -> None:
+        # Extract videos; <audio> and <picture> sources can also reach here through [style]
+        if attrs.get("src") is None:
+            return
+        parent = node.parent
+        while parent is not None and parent.tag != "video":
+            parent = parent.parent
+        if parent is not None:
+            assets["videos"].add(resolve(attrs["src"]))
+
+    def handle_iframe(attrs: dict[str, str | None], _node: LexborNode) -> None:
+        if attrs.get("src") is not None:
+            assets["other"].add(resolve(attrs["src"]))
+
+    handlers = {
+        "link": handle_link,
+        "script": handle_script,
+        "img": handle_img,
+        "source": handle_source,
+        "iframe": handle_iframe,
+    }
+
+    # Match every asset-bearing node in one selector query, dispatching each to its handler
+    for node in tree.css(_ASSET_SELECTOR):
+        attrs = node.attributes
+        handler = handlers.get(node.tag)
+        if handler is not None:
+            handler(attrs, node)
+
+        # Extract background images from inline styles
+        style = attrs.get("style")
+        if style:
+            for match in _CSS_URL_RE.finditer(style):
+                assets["images"].add(resolve(match.group(1).strip()))
+
+    return {category: sorted(urls) for category, urls in assets.items()}
 
 
 @mcp.tool()
@@ -206,75 +496,46 @@ async def download_asset(
         output_dir: The directory to save the asset to (default: downloaded_site)
     """
     try:
-        # Create output directory if it doesn't exist
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        # Determine the filename
-        parsed_url = urllib.parse.urlparse(url)
-        path = parsed_url.path
+        layout = await asyncio.to_thread(DownloadLayout, output_dir)
+    except Exception as e:  # noqa: BLE001
+        # Broad exception is justified as we're returning error information to users
+        return {"success": False, "url": url, "error": str(e)}
 
-        if not path or path.endswith("/"):
-            # Handle URLs without a path or ending with /
-            filename = "index.html"
-        else:
-            filename = Path(path).name
-            if not filename:
-                filename = "unknown_file"
+    return await save_asset(url, layout)
 
-            # Handle query parameters in URLs
-            if parsed_url.query:
-                # Remove invalid characters for filenames
-                safe_query = re.sub(r"[^\w\-\.]", "_", parsed_url.query)
-                filename = f"{filename}_{safe_query}"
 
-        # Create subdirectories based on content type
-        response = await fetch_url(url)
-        content_type = response.headers.get("content-type", "").split(";")[0]
-
-        if "text/html" in content_type:
-            subdir = "html"
-        elif "text/css" in content_type:
-            subdir = "css"
-        elif "javascript" in content_type:
-            subdir = "js"
-        elif "image/" in content_type:
-            subdir = "images"
-        elif "font/" in content_type or "application/font" in content_type:
-            subdir = "fonts"
-        elif "video/" in content_type:
-            subdir = "videos"
-        else:
-            subdir = "other"
+@mcp.tool()
+async def download_assets(
+    urls: list[str],
+    output_dir: str = "downloaded_site",
+    max_concurrency: int = 16,
+) -> list[dict[str, Any]]:
+    """Download multiple assets concurrently and save them to the specified directory.
 
-        # Create the subdirectory
-        subdir_path = output_path / subdir
-        subdir_path.mkdir(parents=True, exist_ok=True)
+    Args:
+        urls: The URLs of the assets to download
+        output_dir: The directory to save the assets to (default: downloaded_site)
+        max_concurrency: Maximum number of downloads in flight at once (default: 16)
+    """
+    try:
+        # Lay out the output directory once for the whole batch
+        layout = await asyncio.to_thread(DownloadLayout, output_dir)
+    except Exception as e:  # noqa: BLE001
+        # Broad exception is justified as we're returning error information to users
+        return [{"success": False, "url": asset_url, "error": str(e)} for asset_url in urls]
 
-        # Save the file
-        file_path = subdir_path / filename
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
 
-        # Check for potential duplicates by adding a counter if needed
-        counter = 1
-        original_file_path = file_path
-        while file_path.exists():
-            file_path = subdir_path / f"{original_file_path.stem}_{counter}{original_file_path.suffix}"
-            counter += 1
+    async def download_one(asset_url: str) -> dict[str, Any]:
+        async with semaphore:
+            return await save_asset(asset_url, layout)
 
-        # Write the content
-        # Using synchronous file operation as we already have the content in memory
-        file_path.write_bytes(response.content)
+    results = await asyncio.gather(*(download_one(asset_url) for asset_url in urls), return_exceptions=True)
 
-        return {
-            "success": True,
-            "url": url,
-            "saved_to": str(file_path),
-            "content_type": content_type,
-            "size": len(response.content),
-        }
-    except Exception as e:  # noqa: BLE001
-        # Broad exception is justified as we're returning error information to users
-        return {"success": False, "url": url, "error": str(e)}
+    return [
+        {"success": False, "url": asset_url, "error": str(result)} if isinstance(result, BaseException) else result
+        for asset_url, result in zip(urls, results)
+    ]
 
 
 @mcp.tool()
@@ -292,42 +553,37 @@ async def parse_css_for_assets(
 
     if css_content is None:
         try:
-            response = await fetch_url(css_url)
-            css_content = response.text
+            css_content = await fetch_text(css_url)
         except Exception as e:  # noqa: BLE001
             # Broad exception is justified as we're returning error information to users
             return {"error": str(e), "fonts": [], "images": []}
 
     # Extract URLs from the CSS
-    fonts = []
-    images = []
-
-    # Find all url() patterns
-    url_patterns = re.findall(r'url\([\'"]?(.*?)[\'"]?\)', css_content)
-
-    for url in url_patterns:
-        full_url = normalize_url(base_url, url)
-
-        # Try to determine if it's a font or image
-        if any(ext in full_url.lower() for ext in [".woff", ".woff2", ".ttf", ".eot", ".otf"]):
-            fonts.append(full_url)
-        elif any(ext in full_url.lower() for ext in [".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"]):
-            images.append(full_url)
+    fonts = set()
+    images = set()
+
+    # One pass over the stylesheet: each match is either a whole @font-face block or a url() outside one
+    for match in _CSS_ASSET_RE.finditer(css_content):
+        font_face, ref = match.groups()
+        if font_face is not None:
+            # Everything referenced from an @font-face rule is a font
+            for font_match in _CSS_URL_RE.finditer(font_face):
+                fonts.add(normalize_url(base_url, font_match.group(1).strip()))
+            continue
+
+        full_url = normalize_url(base_url, ref.strip())
+
+        # Try to determine if it's a font or image by its file extension
+        extension = full_url.partition("?")[0].partition("#")[0].rpartition(".")[2].lower()
+        if extension in _FONT_EXTENSIONS:
+            fonts.add(full_url)
         else:
-            # If we can't determine the type, add it to both lists
-            images.append(full_url)
-
-    # Find @font-face rules and extract src URLs
-    font_face_blocks = re.findall(r"@font-face\s*{[^}]+}", css_content)
-    for block in font_face_blocks:
-        urls = re.findall(r'url\([\'"]?(.*?)[\'"]?\)', block)
-        for url in urls:
-            full_url = normalize_url(base_url, url)
-            fonts.append(full_url)
+            # Images, and anything we can't identify, go in the images list
+            images.add(full_url)
 
     return {
-        "fonts": list(set(fonts)),  # Remove duplicates
-        "images": list(set(images)),  # Remove duplicates
+        "fonts": sorted(fonts),
+        "images": sorted(images),
     }
 
 
@@ -340,32 +596,29 @@ async def create_site_map(url: str, max_depth: int = 1) -> dict[str, Any]:
         max_depth: Maximum depth to crawl (default: 1)
     """
     base_url = get_base_url(url)
-    visited = set()
+    visited = {url}
     sitemap = []
+    # Pages waiting to be crawled, drained breadth-first by a fixed pool of workers
+    queue: asyncio.Queue[tuple[str, int] | None] = asyncio.Queue()
 
     async def crawl(current_url: str, depth: int) -> None:
-        if depth > max_depth or current_url in visited:
-            return
-
-        visited.add(current_url)
-
         try:
-            response = await fetch_url(current_url)
-            html_content = response.text
-            soup = BeautifulSoup(html_content, "html.parser")
+            html_content = await fetch_text(current_url)
+            tree = await asyncio.to_thread(LexborHTMLParser, html_content)
+            title = tree.css_first("title")
 
             page_info = {
                 "url": current_url,
-                "title": soup.title.text if soup.title else "No title",
+                "title": title.text() if title else "No title",
                 "links": [],
             }
 
             sitemap.append(page_info)
 
             if depth < max_depth:
-                links = soup.find_all("a", href=True)
+                links = tree.css("a[href]")
                 for link in links:
-                    href = link["href"]
+                    href = link.attributes["href"]
 
                     # Skip empty links, anchors, javascript, and mailto
                     if not href or href.startswith(("#", "javascript:", "mailto:")):
@@ -377,15 +630,42 @@ async def create_site_map(url: str, max_depth: int = 1) -> dict[str, Any]:
                     # Only crawl URLs from the same domain
                     if get_base_url(full_url) == base_url:
                         page_info["links"].append(
-                            {"url": full_url, "text": link.text.strip() or "No text"},
+                            {"url": full_url, "text": link.text().strip() or "No text"},
                         )
-                        await crawl(full_url, depth + 1)
+                        # Mark as visited when queued so each URL is fetched once, even with cycles
+                        if full_url not in visited:
+                            visited.add(full_url)
+                            queue.put_nowait((full_url, depth + 1))
 
         except Exception as e:  # noqa: BLE001
             # Broad exception is justified as we're returning error information to users
             sitemap.append({"url": current_url, "error": str(e)})
 
-    await crawl(url, 1)
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                await crawl(*item)
+            finally:
+                queue.task_done()
+
+    if max_depth >= 1:
+        queue.put_nowait((url, 1))
+        # The worker count bounds the number of in-flight requests
+        workers = [asyncio.create_task(worker()) for _ in range(MAX_CRAWL_CONCURRENCY)]
+        try:
+            await queue.join()
+
+            # Every page has been crawled; send one sentinel per worker to shut the pool down
+            for _ in workers:
+                queue.put_nowait(None)
+            await asyncio.gather(*workers)
+        finally:
+            # Don't leave workers behind if the crawl itself is cancelled
+            for task in workers:
+                task.cancel()
 
     return {"base_url": base_url, "pages": len(sitemap), "sitemap": sitemap}
 
@@ -397,15 +677,21 @@ async def analyze_page_structure(html_content: str) -> dict[str, Any]:
     Args:
         html_content: The HTML content to analyze
     """
-    soup = BeautifulSoup(html_content, "html.parser")
+    soup = await asyncio.to_thread(parse_soup, html_content)
 
-    # Extract metadata
+    # Walk the tree once, counting tags and collecting metadata
+    tag_counts = Counter()
     metadata = {}
-    for meta in soup.find_all("meta"):
-        if "name" in meta.attrs and "content" in meta.attrs:
-            metadata[meta["name"]] = meta["content"]
-        elif "property" in meta.attrs and "content" in meta.attrs:
-            metadata[meta["property"]] = meta["content"]
+    for element in soup.find_all():
+        name = element.name
+        tag_counts[name] += 1
+
+        # Extract metadata
+        if name == "meta":
+            if "name" in element.attrs and "content" in element.attrs:
+                metadata[element["name"]] = element["content"]
+            elif "property" in element.attrs and "content" in element.attrs:
+                metadata[element["property"]] = element["content"]
 
     # Extract main semantic elements
     semantic_elements = {}
@@ -418,31 +704,24 @@ async def analyze_page_structure(html_content: str) -> dict[str, Any]:
         "section",
         "article",
     ]:
-        elements = soup.find_all(element_type)
-        if elements:
-            semantic_elements[element_type] = len(elements)
+        if tag_counts[element_type]:
+            semantic_elements[element_type] = tag_counts[element_type]
 
     # Extract headings
-    headings = {}
-    for level in range(1, 7):
-        heading_tag = f"h{level}"
-        headings[heading_tag] = len(soup.find_all(heading_tag))
-
-    # Find main content area (heuristic)
-    main_content = soup.find("main")
-    if not main_content:
-        # Try to find the largest content area if <main> is not available
-        candidates = soup.find_all(["article", "div", "section"])
-        if candidates:
-            main_content = max(candidates, key=lambda x: len(str(x)))
+    headings = {f"h{level}": tag_counts[f"h{level}"] for level in range(1, 7)}
+
+    # Find main content area (heuristic): a <main> element, or failing that any article, div or
+    # section that could hold the content. Only its presence is reported, so there's no need to
+    # work out which candidate is largest.
+    has_main_content = any(tag_counts[tag] for tag in ("main", "article", "div", "section"))
 
     # Analyze page layout
     layout_analysis = {
-        "has_header": bool(soup.find("header")),
-        "has_footer": bool(soup.find("footer")),
-        "has_navigation": bool(soup.find("nav")),
-        "has_sidebar": bool(soup.find("aside")),
-        "has_main_content": bool(main_content),
+        "has_header": bool(tag_counts["header"]),
+        "has_footer": bool(tag_counts["footer"]),
+        "has_navigation": bool(tag_counts["nav"]),
+        "has_sidebar": bool(tag_counts["aside"]),
+        "has_main_content": has_main_content,
     }
 
     return {
@@ -451,10 +730,10 @@ async def analyze_page_structure(html_content: str) -> dict[str, Any]:
         "semantic_structure": semantic_elements,
         "headings": headings,
         "layout_analysis": layout_analysis,
-        "total_elements": len(soup.find_all()),
-        "total_links": len(soup.find_all("a")),
-        "total_images": len(soup.find_all("img")),
-        "total_forms": len(soup.find_all("form")),
+        "total_elements": tag_counts.total(),
+        "total_links": tag_counts["a"],
+        "total_images": tag_counts["img"],
+        "total_forms": tag_counts["form"],
     }
 
 